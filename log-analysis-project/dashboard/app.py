@@ -3,11 +3,18 @@ Plotly Dash dashboard for visualizing brute-force detection results.
 
 Features:
 - Summary KPI cards
-- Histogram of failed logins by IP
+- Bar chart of failed logins for the top IPs
 - Time-series of failed logins
 - World map scatter (mock geolocation)
 - Interactive table of brute-force alerts
 
+The detection pipeline does not run at import time: the layout starts empty and
+a (background, when dash[diskcache] is installed) callback fills it on page load,
+on a polling interval and on "Refresh Data". Its result is cached on disk keyed
+only by the events file modification time (the interval/click counters are left
+out of the key), so unchanged data is served without recomputation; entries
+expire after DASH_CACHE_EXPIRE_S.
+
 To run:
     python -m dashboard.app
 Open http://127.0.0.1:8050 in your browser.
@@ -15,85 +22,120 @@ Open http://127.0.0.1:8050 in your browser.
 
 import os
 import pandas as pd
-from dash import Dash, dcc, html, dash_table, Input, Output
-import plotly.express as px
-from scripts.extract_events import extract
-from scripts.detect_bruteforce import detect_bruteforce
-from scripts.anomaly_detection import detect_anomalous_ips
-from scripts.geolocation import geo_lookup
+from dash import Dash, dcc, html, dash_table, Input, Output, ctx
+import plotly.graph_objects as go
+from scripts.cache import load_pipeline
+from scripts.geolocation import build_geo_table
 from scripts.utils import get_logger
 from dashboard.components import kpi_card
 
 logger = get_logger("dashboard")
 
-# Prepare data (extract events if necessary)
 EVENTS_CSV = "events_extracted.csv"
-if not os.path.exists(EVENTS_CSV):
-    events_df = extract()
-else:
-    events_df = pd.read_csv(EVENTS_CSV, parse_dates=["timestamp"])
-alerts_df = detect_bruteforce(events_df)
-anomalies_df = detect_anomalous_ips(events_df, window_minutes=120, contamination=0.1)
-
-# Build geolocation DataFrame for plotting
-fails = events_df[events_df["event_type"] == "failed_login"].copy()
-geo_rows = []
-for _, r in fails.iterrows():
-    ip = r["ip"]
-    geo = geo_lookup(ip)
-    geo_rows.append({
-        "ip": ip,
-        "username": r["username"],
-        "timestamp": r["timestamp"],
-        "country": geo["country"],
-        "region": geo["region"],
-        "city": geo["city"],
-        "lat": geo["lat"],
-        "lon": geo["lon"]
-    })
-geo_df = pd.DataFrame(geo_rows).drop_duplicates(subset=["ip", "lat", "lon"])
-
-# Create figures
-if not fails.empty:
-    hist = px.histogram(fails, x="ip", title="Failed Logins by IP")
-    ts_df = fails.set_index(pd.to_datetime(fails["timestamp"]))
-    ts_counts = ts_df.resample("1T").size().rename("count").reset_index()
-    ts_plot = px.line(ts_counts, x="timestamp", y="count", title="Failed Logins Over Time (1min)")
-else:
-    hist = px.histogram()
-    ts_plot = px.line()
-
-if not geo_df.empty:
-    world = px.scatter_geo(geo_df, lat="lat", lon="lon", hover_name="ip", scope="world", title="Attacker Geolocation (mock)")
-else:
-    world = px.scatter_geo()
+DASH_CACHE_DIR = ".dash_cache"
+DASH_CACHE_EXPIRE_S = 24 * 60 * 60
+REFRESH_INTERVAL_MS = 60 * 1000
+TOP_IPS = 50
+GRAPH_CONFIG = {"toImageButtonOptions": {"format": "png", "scale": 2}}
+ALERT_TABLE_COLUMNS = ["flag_type", "flag_value", "first_seen", "last_seen", "count"]
+
+
+def events_mtime():
+    """
+    Modification time of the events CSV, or None if it has not been extracted yet.
+    Used as the cache key for dashboard data.
+    """
+    return os.path.getmtime(EVENTS_CSV) if os.path.exists(EVENTS_CSV) else None
+
+
+def _background_managers():
+    """
+    Return (data_manager, action_manager) sharing one diskcache store, or
+    (None, None) if the dash[diskcache] extras (diskcache, psutil, multiprocess) are missing.
+
+    data_manager caches results per events mtime. action_manager has no cache_by,
+    so its results are dropped once read and side-effecting callbacks always run.
+    """
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+        # The manager itself imports psutil and multiprocess
+        cache = diskcache.Cache(DASH_CACHE_DIR)
+        return (DiskcacheManager(cache, cache_by=[events_mtime], expire=DASH_CACHE_EXPIRE_S),
+                DiskcacheManager(cache))
+    except ImportError:
+        logger.warning("dash[diskcache] not installed; dashboard callbacks run in the request thread.")
+        return None, None
+
+
+def build_figures(views):
+    """
+    Build the histogram, time-series and world-map figures from the failed-login view.
+    """
+    fails = views.fails
+
+    # One row per distinct failed IP
+    geo_df = build_geo_table(views.ip_values).reset_index()
+
+    # Aggregate server-side so only per-IP / per-minute points are sent to the browser
+    if not fails.empty:
+        counts = fails["ip"].value_counts()
+        counts = counts[counts > 0].head(TOP_IPS)
+        hist = go.Figure(go.Bar(x=counts.index.astype(str), y=counts.values))
+        hist.update_layout(title=f"Failed Logins by IP (top {TOP_IPS})")
+        ts_df = fails.set_index(pd.to_datetime(fails["timestamp"]))
+        ts_counts = ts_df.resample("1T").size().rename("count").reset_index()
+        ts_plot = go.Figure(go.Scattergl(x=ts_counts["timestamp"], y=ts_counts["count"], mode="lines"))
+        ts_plot.update_layout(title="Failed Logins Over Time (1min)")
+    else:
+        hist = go.Figure()
+        ts_plot = go.Figure()
+
+    if not geo_df.empty:
+        world = go.Figure(go.Scattergeo(lat=geo_df["lat"], lon=geo_df["lon"], hovertext=geo_df["ip"].astype(str), mode="markers"))
+        world.update_layout(title="Attacker Geolocation (mock)")
+    else:
+        world = go.Figure(go.Scattergeo())
+    return hist, ts_plot, world
+
+
+def build_kpis(events, alerts):
+    """
+    Return the KPI card row children for the given events and alerts.
+    """
+    n_fails = int((events["event_type"] == "failed_login").sum())
+    cards = [
+        kpi_card("Total Events", str(len(events)), "Events analyzed"),
+        kpi_card("Failed Logins", str(n_fails), "Total failures"),
+        kpi_card("Unique IPs", str(events["ip"].nunique()), ""),
+        kpi_card("Alerts", str(len(alerts)), "Brute-force alerts"),
+    ]
+    return [html.Div(card, style={"width": "24%", "display": "inline-block", "padding": "8px"}) for card in cards]
+
 
 # Dash App layout
-app = Dash(__name__, title="Brute-force Detection Dashboard")
+background_manager, action_manager = _background_managers()
+app = Dash(__name__, title="Brute-force Detection Dashboard", background_callback_manager=background_manager)
 
 app.layout = html.Div(children=[
     html.H2("Windows Log Brute-Force Detection Dashboard"),
-    html.Div([
-        html.Div(kpi_card("Total Events", str(len(events_df)), "Events analyzed"), style={"width": "24%", "display": "inline-block", "padding": "8px"}),
-        html.Div(kpi_card("Failed Logins", str(len(fails)), "Total failures"), style={"width": "24%", "display": "inline-block", "padding": "8px"}),
-        html.Div(kpi_card("Unique IPs", str(events_df["ip"].nunique()), ""), style={"width": "24%", "display": "inline-block", "padding": "8px"}),
-        html.Div(kpi_card("Alerts", str(len(alerts_df)), "Brute-force alerts"), style={"width": "24%", "display": "inline-block", "padding": "8px"}),
-    ], style={"display": "flex", "flexWrap": "wrap"}),
+    dcc.Interval(id="data-interval", interval=REFRESH_INTERVAL_MS, n_intervals=0),
+    html.Div(id="kpi-row", style={"display": "flex", "flexWrap": "wrap"}),
 
     html.Div([
-        html.Div(dcc.Graph(figure=hist), style={"width": "48%", "display": "inline-block", "padding": "8px"}),
-        html.Div(dcc.Graph(figure=ts_plot), style={"width": "48%", "display": "inline-block", "padding": "8px"}),
+        html.Div(dcc.Graph(id="hist-graph", config=GRAPH_CONFIG), style={"width": "48%", "display": "inline-block", "padding": "8px"}),
+        html.Div(dcc.Graph(id="ts-graph", config=GRAPH_CONFIG), style={"width": "48%", "display": "inline-block", "padding": "8px"}),
     ]),
 
     html.Div([
-        html.Div(dcc.Graph(figure=world), style={"width": "100%", "padding": "8px"}),
+        html.Div(dcc.Graph(id="world-graph", config=GRAPH_CONFIG), style={"width": "100%", "padding": "8px"}),
     ]),
 
     html.H3("Brute-force Alerts"),
     dash_table.DataTable(
         id="alerts-table",
-        columns=[{"name": c, "id": c} for c in (alerts_df.columns.tolist() if not alerts_df.empty else ["flag_type","flag_value","first_seen","last_seen","count"])],
-        data=alerts_df.to_dict("records") if not alerts_df.empty else [],
+        columns=[{"name": c, "id": c} for c in ALERT_TABLE_COLUMNS],
+        data=[],
         page_size=10,
         style_table={"overflowX": "auto"},
     ),
@@ -106,30 +148,55 @@ app.layout = html.Div(children=[
 ])
 
 
+@app.callback(
+    Output("kpi-row", "children"),
+    Output("hist-graph", "figure"),
+    Output("ts-graph", "figure"),
+    Output("world-graph", "figure"),
+    Output("alerts-table", "columns"),
+    Output("alerts-table", "data"),
+    Input("data-interval", "n_intervals"),
+    Input("refresh-btn", "n_clicks"),
+    background=background_manager is not None,
+    # Key the cache on the events mtime only, not on the interval/click counters
+    cache_args_to_ignore=[0, 1],
+)
+def update_dashboard(n_intervals, refresh_clicks):
+    """
+    Run the pipeline and rebuild every data-driven component.
+    Runs on page load, on the polling interval and on "Refresh Data"; detection
+    results come from the disk cache unless the events file changed.
+    """
+    events_df, views, alerts_df, anomalies_df = load_pipeline(EVENTS_CSV)
+    hist, ts_plot, world = build_figures(views)
+    columns = alerts_df.columns.tolist() if not alerts_df.empty else ALERT_TABLE_COLUMNS
+    return (
+        build_kpis(events_df, alerts_df),
+        hist,
+        ts_plot,
+        world,
+        [{"name": c, "id": c} for c in columns],
+        alerts_df.to_dict("records"),
+    )
+
+
 @app.callback(
     Output("action-output", "children"),
     Input("refresh-btn", "n_clicks"),
-    Input("pdf-btn", "n_clicks")
+    Input("pdf-btn", "n_clicks"),
+    background=action_manager is not None,
+    manager=action_manager,
+    prevent_initial_call=True,
 )
 def on_action(refresh_clicks, pdf_clicks):
-    ctx = dash.callback_context
-    if not ctx.triggered:
-        return ""
-    button_id = ctx.triggered[0]["prop_id"].split(".")[0]
-    if button_id == "refresh-btn":
-        # reload data
-        global events_df, alerts_df, anomalies_df
-        if os.path.exists(EVENTS_CSV):
-            events_df = pd.read_csv(EVENTS_CSV, parse_dates=["timestamp"])
-        else:
-            events_df = extract()
-        alerts_df = detect_bruteforce(events_df)
-        anomalies_df = detect_anomalous_ips(events_df)
+    triggered = ctx.triggered_id
+    if triggered == "refresh-btn":
+        # The data itself is reloaded by update_dashboard, which also listens to this button
         return "Data refreshed."
-    if button_id == "pdf-btn":
-        # generate PDF synchronously (for demo)
+    if triggered == "pdf-btn":
+        # generate PDF off the request thread when a background manager is available
         from scripts.generate_report import generate_pdf_report
-        pdf_path = generate_pdf_report()
+        pdf_path = generate_pdf_report(events_csv=EVENTS_CSV)
         return f"Generated PDF: {pdf_path}"
     return ""
 
@@ -10,6 +10,7 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import IsolationForest
 from .extract_events import extract
+from .pipeline import as_views
 from .utils import get_logger
 from datetime import timedelta
 
@@ -20,38 +21,43 @@ def compute_ip_failure_features(df, window=None):
     """
     Compute aggregated features per IP for failed logins.
 
-    df: events DataFrame (must have timestamp, event_type, ip)
+    df: events DataFrame (must have timestamp, event_type, ip), or an EventViews
     window: optional timedelta to restrict to the latest window; if None, use all data
     Returns DataFrame indexed by ip with feature columns.
     """
-    if df.empty:
+    if isinstance(df, pd.DataFrame) and df.empty:
         return pd.DataFrame(columns=["ip", "total_failures", "distinct_user_count", "failures_per_min"])
 
-    fails = df[df["event_type"] == "failed_login"].copy()
-    if window:
-        latest = pd.to_datetime(fails["timestamp"]).max()
-        cutoff = latest - window
-        fails = fails[pd.to_datetime(fails["timestamp"]) >= cutoff]
+    # Work on the shared failure view: int64 timestamps and factorized ip/user codes
+    views = as_views(df)
+    ts_ns = views.fails_ts_ns
+    mask = views.ip_codes >= 0
+    if window and len(ts_ns):
+        mask &= ts_ns >= ts_ns.max() - pd.Timedelta(window).value
 
-    if fails.empty:
+    if not mask.any():
         return pd.DataFrame(columns=["ip", "total_failures", "distinct_user_count", "failures_per_min"])
 
     # Features:
     # - total_failures: count
     # - distinct_user_count: number of distinct target usernames tried
     # - failures_per_min: failures divided by duration in minutes (min 1)
-    grouped = fails.groupby("ip")
-    rows = []
-    for ip, g in grouped:
-        times = pd.to_datetime(g["timestamp"]).sort_values()
-        duration_minutes = max(((times.max() - times.min()).total_seconds() / 60.0), 1.0)
-        rows.append({
-            "ip": ip,
-            "total_failures": int(len(g)),
-            "distinct_user_count": int(g["username"].nunique()),
-            "failures_per_min": len(g) / duration_minutes,
-        })
-    return pd.DataFrame(rows).set_index("ip")
+    user_codes = views.user_codes[mask]
+    frame = pd.DataFrame({
+        "ip": views.ip_codes[mask],
+        "user": np.where(user_codes >= 0, user_codes, np.nan),
+        "ts": ts_ns[mask],
+    })
+    agg = frame.groupby("ip").agg(
+        total_failures=("ts", "size"),
+        distinct_user_count=("user", "nunique"),
+        tmin=("ts", "min"),
+        tmax=("ts", "max"),
+    )
+    duration_minutes = ((agg["tmax"] - agg["tmin"]) / 60e9).clip(lower=1.0)
+    agg["failures_per_min"] = agg["total_failures"] / duration_minutes
+    agg.index = pd.Index(views.ip_values[agg.index.to_numpy()], name="ip")
+    return agg.drop(columns=["tmin", "tmax"]).sort_index()
 
 
 def run_isolation_forest(features_df, contamination=0.05, random_state=42):
@@ -63,22 +69,24 @@ def run_isolation_forest(features_df, contamination=0.05, random_state=42):
     if features_df.empty:
         return pd.DataFrame(columns=["ip", "anomaly_score", "anomaly_flag"]).set_index("ip")
 
-    # Use numeric features
-    X = features_df.fillna(0).values
-    model = IsolationForest(contamination=contamination, random_state=random_state)
+    # Use numeric features as a C-contiguous float32 matrix: sklearn's trees
+    # work in float32 internally, so this avoids a float64 copy on fit and score.
+    X = np.ascontiguousarray(features_df.fillna(0).to_numpy(dtype=np.float32))
+    model = IsolationForest(contamination=contamination, random_state=random_state, n_jobs=-1)
     model.fit(X)
-    scores = model.decision_function(X)
-    preds = model.predict(X)  # -1 for anomaly, 1 for normal
+    # Single forest traversal: decision_function and predict both derive from
+    # score_samples shifted by offset_, so compute it once and threshold here.
+    scores = model.score_samples(X) - model.offset_
     result = pd.DataFrame({
         "anomaly_score": scores,
-        "anomaly_flag": (preds == -1)
+        "anomaly_flag": (scores < 0)
     }, index=features_df.index)
     return result
 
 
 def detect_anomalous_ips(df, window_minutes=60, contamination=0.05):
     """
-    High-level helper:
+    High-level helper (df may be an events DataFrame or an EventViews):
     - compute features over the past `window_minutes`
     - run IsolationForest
     - merge features and anomaly outputs and return DataFrame
@@ -0,0 +1,63 @@
+"""
+Disk-memoized pipeline steps shared by the dashboard and the PDF report.
+
+- Detection results are cached with joblib.Memory, keyed on the events file
+  path, modification time and size, so in-place edits invalidate the cache.
+- load_pipeline(events_csv) returns (events, views, alerts, anomalies),
+  extracting the CSV first if it does not exist yet. `views` is the EventViews
+  the detectors used, so callers can chart it without rebuilding it.
+
+Note that a cache hit skips detect_bruteforce's alerts file export.
+"""
+
+import os
+from joblib import Memory
+from .extract_events import extract
+from .io import load_events
+from .detect_bruteforce import detect_bruteforce
+from .anomaly_detection import detect_anomalous_ips
+from .pipeline import build_views
+from .utils import get_logger
+
+logger = get_logger("cache")
+
+CACHE_DIR = ".cache"
+memory = Memory(CACHE_DIR, verbose=0)
+
+
+def file_key(path):
+    """
+    Cache key for a file: (path, mtime, size).
+    """
+    return path, os.path.getmtime(path), os.path.getsize(path)
+
+
+@memory.cache
+def _cached_detections(path, mtime, size, window_minutes, contamination):
+    views = build_views(load_events(path))
+    return (views, detect_bruteforce(views),
+            detect_anomalous_ips(views, window_minutes=window_minutes, contamination=contamination))
+
+
+def cached_detections(path, window_minutes=120, contamination=0.1):
+    """
+    (views, alerts, anomalies) for an events CSV, recomputed only when the file changes.
+    Both detectors share one failed-login view of the events, which is returned with them.
+    """
+    return _cached_detections(*file_key(path), window_minutes, contamination)
+
+
+def load_pipeline(events_csv, window_minutes=120, contamination=0.1):
+    """
+    Return (events, views, alerts, anomalies) for `events_csv`, extracting sample logs if it is missing.
+    """
+    if not os.path.exists(events_csv):
+        logger.info("Events CSV not found; extracting from sample logs.")
+        events = extract(output_csv=events_csv)
+        if events.empty:
+            # Nothing was written, so there is no file to key the cache on
+            views = build_views(events)
+            return (events, views, detect_bruteforce(views),
+                    detect_anomalous_ips(views, window_minutes=window_minutes, contamination=contamination))
+    views, alerts, anomalies = cached_detections(events_csv, window_minutes, contamination)
+    return load_events(events_csv), views, alerts, anomalies
@@ -7,106 +7,183 @@ Rules implemented:
 
 Outputs:
 - A function returning flagged IPs and usernames
-- Save bruteforce_alerts.csv with details
+- Save bruteforce_alerts.parquet with details (list columns stored natively);
+  set BRUTEFORCE_ALERTS_CSV=1 to also write the legacy bruteforce_alerts.csv
+
+The window scan is JIT-compiled with numba when it is installed; otherwise a
+vectorized NumPy implementation is used. Both give identical results.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import timedelta
 import os
 from .extract_events import extract
+from .pipeline import as_views, iter_code_groups
 from .utils import get_logger
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger = get_logger("detect_bruteforce")
 
+ALERTS_PARQUET = "bruteforce_alerts.parquet"
+ALERTS_CSV = "bruteforce_alerts.csv"
+ALERTS_CSV_ENV = "BRUTEFORCE_ALERTS_CSV"
+
+ALERT_COLUMNS = ["flag_type", "flag_value", "first_seen", "last_seen", "count", "sample_ips", "sample_users"]
+
+
+def _window_hits_numpy(ts_ns, window_ns, threshold):
+    """
+    Find non-overlapping sliding-window hits in a sorted int64 timestamp array.
+
+    Equivalent to the two-pointer scan: for each event i the window starts at the
+    earliest event no more than `window_ns` older, and after a hit the next
+    window may only start after i. Returns a list of (start, end) positions.
+    """
+    # Natural window start for every event, computed in one vectorized call
+    starts = np.searchsorted(ts_ns, ts_ns - window_ns, side="left")
+    hits = np.nonzero(np.arange(len(ts_ns)) - starts + 1 >= threshold)[0]
+    out = []
+    reset = 0
+    while True:
+        # After a hit the window is clamped to `reset`, so the next hit also
+        # needs at least `threshold` events since then.
+        pos = np.searchsorted(hits, reset + threshold - 1, side="left")
+        if pos >= len(hits):
+            break
+        i = int(hits[pos])
+        start = max(int(starts[i]), reset)
+        out.append((start, i))
+        reset = i + 1
+    return out
+
+
+def _window_hits_kernel(ts_ns, window_ns, threshold):
+    """
+    Two-pointer window scan over a sorted int64 array, written for numba.
+
+    Returns (starts, ends, counts) arrays describing the non-overlapping hits.
+    """
+    n = ts_ns.shape[0]
+    starts_out = np.empty(n, dtype=np.int64)
+    ends_out = np.empty(n, dtype=np.int64)
+    counts_out = np.empty(n, dtype=np.int64)
+    k = 0
+    start = 0
+    for i in range(n):
+        while start < i and ts_ns[i] - ts_ns[start] > window_ns:
+            start += 1
+        count = i - start + 1
+        if count >= threshold:
+            starts_out[k] = start
+            ends_out[k] = i
+            counts_out[k] = count
+            k += 1
+            start = i + 1
+    return starts_out[:k], ends_out[:k], counts_out[:k]
+
+
+_window_hits_jit = njit(cache=True)(_window_hits_kernel) if njit is not None else None
+
+
+def _window_hits(ts_ns, window_ns, threshold):
+    """
+    Return non-overlapping (start, end) window hits, using the numba kernel when available.
+    """
+    if _window_hits_jit is None:
+        return _window_hits_numpy(ts_ns, window_ns, threshold)
+    starts, ends, _ = _window_hits_jit(ts_ns, window_ns, threshold)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def save_alerts(alerts_df, outpath=ALERTS_PARQUET):
+    """
+    Write alerts to Parquet (zstd). Falls back to CSV if pyarrow is missing, and
+    also writes CSV when the BRUTEFORCE_ALERTS_CSV environment variable is set.
+    """
+    write_csv = bool(os.environ.get(ALERTS_CSV_ENV))
+    try:
+        alerts_df.to_parquet(outpath, engine="pyarrow", compression="zstd", index=False)
+        logger.info(f"Saved brute-force alerts to {outpath}")
+    except ImportError:
+        logger.warning("pyarrow not installed; saving brute-force alerts as CSV instead.")
+        write_csv = True
+    if write_csv:
+        alerts_df.to_csv(ALERTS_CSV, index=False)
+        logger.info(f"Saved brute-force alerts to {ALERTS_CSV}")
+
 
 def detect_bruteforce(df, ip_threshold=5, ip_window=timedelta(minutes=2),
                       user_threshold=5, user_window=timedelta(minutes=10)):
     """
     Detect brute-force attempts, returning a DataFrame of alerts.
 
-    df: DataFrame containing parsed/extracted events (must have timestamp, event_type, username, ip)
+    df: DataFrame containing parsed/extracted events (must have timestamp, event_type, username, ip),
+        or an EventViews built from one with pipeline.build_views
     ip_threshold, ip_window: threshold and timeframe for IP-based detection
     user_threshold, user_window: threshold and timeframe for username-based detection
     """
-    if df.empty:
-        return pd.DataFrame(columns=[
-            "flag_type", "flag_value", "first_seen", "last_seen", "count", "sample_ips", "sample_users"
-        ])
-
-    # Work only with failures
-    fails = df[df["event_type"] == "failed_login"].copy()
-    fails = fails.sort_values("timestamp")
+    if isinstance(df, pd.DataFrame) and df.empty:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+
+    # Failures are filtered, time-sorted and converted to int64 ns once in the views
+    views = as_views(df)
+    times = views.fails["timestamp"]
+    ts_ns = views.fails_ts_ns
+    users_arr = views.fails["username"].to_numpy()
+    ips_arr = views.fails["ip"].to_numpy()
+    ip_window_ns = pd.Timedelta(ip_window).value
+    user_window_ns = pd.Timedelta(user_window).value
     alerts = []
 
-    # IP-based sliding window
-    # For efficiency, group by IP and scan timestamps
-    for ip, group in fails.groupby("ip"):
+    # IP-based sliding window; positions of each group are in time order, so a
+    # window is a contiguous slice of them. Groups with fewer than the threshold
+    # number of failures can never trigger and are skipped before the scan.
+    for code, pos in iter_code_groups(views.ip_codes, min_size=ip_threshold):
+        ip = views.ip_values[code]
         if not ip:
             continue
-        times = pd.to_datetime(group["timestamp"]).sort_values()
-        # sliding window: count number of events inside window for each event as start
-        # simpler: use pandas rolling via integer positions
-        # We'll use two-pointer method for clarity
-        start_idx = 0
-        times_list = list(times)
-        for i, t in enumerate(times_list):
-            # move start forward while window exceeded
-            while start_idx < i and (t - times_list[start_idx]) > ip_window:
-                start_idx += 1
-            count = i - start_idx + 1
-            if count >= ip_threshold:
-                first_seen = times_list[start_idx]
-                last_seen = t
-                sample_users = group[(group["timestamp"] >= first_seen) & (group["timestamp"] <= last_seen)]["username"].unique().tolist()
-                alerts.append({
-                    "flag_type": "ip",
-                    "flag_value": ip,
-                    "first_seen": first_seen,
-                    "last_seen": last_seen,
-                    "count": count,
-                    "sample_ips": [ip],
-                    "sample_users": sample_users,
-                })
-                # advance start to avoid duplicate overlapping alerts
-                start_idx = i + 1
+        for start, end in _window_hits(ts_ns[pos], ip_window_ns, ip_threshold):
+            window = pos[start:end + 1]
+            alerts.append({
+                "flag_type": "ip",
+                "flag_value": ip,
+                "first_seen": times.iloc[window[0]],
+                "last_seen": times.iloc[window[-1]],
+                "count": len(window),
+                "sample_ips": [ip],
+                "sample_users": pd.unique(users_arr[window]).tolist(),
+            })
 
     # Username-based detection
-    for user, group in fails.groupby("username"):
+    for code, pos in iter_code_groups(views.user_codes, min_size=user_threshold):
+        user = views.user_values[code]
         if not user:
             continue
-        times = pd.to_datetime(group["timestamp"]).sort_values()
-        start_idx = 0
-        times_list = list(times)
-        for i, t in enumerate(times_list):
-            while start_idx < i and (t - times_list[start_idx]) > user_window:
-                start_idx += 1
-            count = i - start_idx + 1
-            if count >= user_threshold:
-                first_seen = times_list[start_idx]
-                last_seen = t
-                sample_ips = group[(group["timestamp"] >= first_seen) & (group["timestamp"] <= last_seen)]["ip"].unique().tolist()
-                alerts.append({
-                    "flag_type": "username",
-                    "flag_value": user,
-                    "first_seen": first_seen,
-                    "last_seen": last_seen,
-                    "count": count,
-                    "sample_ips": sample_ips,
-                    "sample_users": [user],
-                })
-                start_idx = i + 1
-
-    alerts_df = pd.DataFrame(alerts)
+        for start, end in _window_hits(ts_ns[pos], user_window_ns, user_threshold):
+            window = pos[start:end + 1]
+            alerts.append({
+                "flag_type": "username",
+                "flag_value": user,
+                "first_seen": times.iloc[window[0]],
+                "last_seen": times.iloc[window[-1]],
+                "count": len(window),
+                "sample_ips": pd.unique(ips_arr[window]).tolist(),
+                "sample_users": [user],
+            })
+
+    alerts_df = pd.DataFrame(alerts, columns=ALERT_COLUMNS)
     if not alerts_df.empty:
-        # Normalize timestamps and save CSV
+        # Normalize timestamps and save
         alerts_df["first_seen"] = pd.to_datetime(alerts_df["first_seen"])
         alerts_df["last_seen"] = pd.to_datetime(alerts_df["last_seen"])
-        outpath = "bruteforce_alerts.csv"
-        alerts_df.to_csv(outpath, index=False)
-        logger.info(f"Saved brute-force alerts to {outpath}")
+        save_alerts(alerts_df)
     else:
         logger.info("No brute-force alerts detected.")
-        alerts_df = alerts_df[["flag_type", "flag_value", "first_seen", "last_seen", "count", "sample_ips", "sample_users"]]
 
     return alerts_df
 
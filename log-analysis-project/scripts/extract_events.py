@@ -4,43 +4,52 @@ Event extraction and mapping.
 - Reads parsed events (or raw logs) and canonicalizes event types:
     4625 -> failed login (status Failure)
     4624 -> successful login (status Success)
-- Produces events.csv with a lightweight schema used downstream.
+- Produces events.csv with a lightweight schema used downstream
+  (ip, username, event_type and status as categoricals).
 """
 
 import pandas as pd
 import os
 from .parser import parse_directory
+from .io import CATEGORY_COLUMNS
 from .utils import get_logger
 
 logger = get_logger("extract_events")
 
 
+EVENT_TYPE_MAP = {4625: "failed_login", 4624: "successful_login"}
+EVENT_TYPES = ["failed_login", "successful_login", "other"]
+
+
 def map_event_types(df):
     """
     Add 'event_type' column mapping event_id to human-readable strings.
+    The column is categorical so downstream equality filters compare codes.
     """
-    def map_type(row):
-        if row["event_id"] == 4625:
-            return "failed_login"
-        if row["event_id"] == 4624:
-            return "successful_login"
-        return "other"
-    df["event_type"] = df.apply(map_type, axis=1)
+    df["event_type"] = pd.Categorical(
+        df["event_id"].map(EVENT_TYPE_MAP).fillna("other"), categories=EVENT_TYPES
+    )
     return df
 
 
-def extract(input_dir="data/sample_logs", output_csv="events_extracted.csv"):
+def extract(input_dir="data/sample_logs", output_csv="events_extracted.csv", include_raw=False):
     """
     Parse directory and write extracted events to CSV.
+    raw_event is only filled in when include_raw is True. If no events are
+    found, nothing is written and an empty frame with the same columns is returned.
     """
     logger.info(f"Extracting events from {input_dir}")
-    df = parse_directory(input_dir)
-    if df.empty:
-        logger.warning("No events to extract.")
-        return df
+    df = parse_directory(input_dir, include_raw=include_raw)
+    # Mapped and typed even when empty, so callers get the same columns either way
     df = map_event_types(df)
+    # Low-cardinality columns as categoricals: smaller frames, integer-keyed groupbys
+    for c in CATEGORY_COLUMNS:
+        df[c] = df[c].astype("category")
     # Keep relevant columns
     out = df[["timestamp", "event_id", "event_type", "username", "ip", "status", "raw_event"]]
+    if out.empty:
+        logger.warning("No events to extract.")
+        return out
     out.to_csv(output_csv, index=False)
     logger.info(f"Wrote extracted events to {output_csv}")
     return out
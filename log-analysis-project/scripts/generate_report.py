@@ -16,73 +16,57 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
 from reportlab.lib import colors
 from reportlab.platypus import Table, TableStyle
-from .extract_events import extract
-from .detect_bruteforce import detect_bruteforce
-from .anomaly_detection import detect_anomalous_ips
-from .geolocation import geo_lookup
+from .cache import load_pipeline
+from .pipeline import as_views
+from .geolocation import build_geo_table
 from .utils import get_logger
 
 logger = get_logger("generate_report")
 
 
-def create_charts(df, outdir="reports_assets"):
+def _render_hist(counts, path):
     """
-    Create and save charts used in the PDF.
-    Returns dict of image filenames.
+    Render the failed-logins-by-IP bar chart from per-IP counts.
     """
-    os.makedirs(outdir, exist_ok=True)
-    assets = {}
-
-    # Histogram: failed logins by IP
-    fails = df[df["event_type"] == "failed_login"]
-    hist_path = os.path.join(outdir, "hist_failures_by_ip.png")
-    if not fails.empty:
-        counts = fails.groupby("ip").size().sort_values(ascending=False)
-        plt.figure(figsize=(8, 4))
+    plt.figure(figsize=(8, 4))
+    if not counts.empty:
         counts.plot(kind="bar", color="crimson")
         plt.title("Failed logins by IP")
         plt.xlabel("IP")
         plt.ylabel("Failed count")
         plt.tight_layout()
-        plt.savefig(hist_path, dpi=150)
-        plt.close()
     else:
         # placeholder empty chart
-        plt.figure(figsize=(8, 4))
         plt.text(0.5, 0.5, "No failed logins", ha="center")
         plt.axis("off")
-        plt.savefig(hist_path, dpi=150)
-        plt.close()
-    assets["hist_failures_by_ip"] = hist_path
+    plt.savefig(path, dpi=150)
+    plt.close()
+    return path
 
-    # Time-series: failed logins over time
-    ts_path = os.path.join(outdir, "ts_failures.png")
-    if not fails.empty:
-        ts = fails.set_index(pd.to_datetime(fails["timestamp"]))
-        ts_count = ts.resample("1T").size()
-        plt.figure(figsize=(10, 3))
+
+def _render_ts(ts_count, path):
+    """
+    Render the failed-logins time series from per-minute counts.
+    """
+    plt.figure(figsize=(10, 3))
+    if not ts_count.empty:
         ts_count.plot(linewidth=2)
         plt.title("Failed logins over time (1 minute buckets)")
         plt.xlabel("Time")
         plt.ylabel("Failed count")
         plt.tight_layout()
-        plt.savefig(ts_path, dpi=150)
-        plt.close()
     else:
-        plt.figure(figsize=(10, 3))
         plt.text(0.5, 0.5, "No failed logins to plot", ha="center")
         plt.axis("off")
-        plt.savefig(ts_path, dpi=150)
-        plt.close()
-    assets["ts_failures"] = ts_path
+    plt.savefig(path, dpi=150)
+    plt.close()
+    return path
 
-    # World map scatter (very simple using scatter plot with mock geolocations)
-    world_path = os.path.join(outdir, "world_map.png")
-    # Build scatter from unique failed IPs with geolocation
-    positions = []
-    for ip in fails["ip"].dropna().unique():
-        g = geo_lookup(ip)
-        positions.append((g["lon"], g["lat"], ip))
+
+def _render_world(positions, path):
+    """
+    Render the attacker geolocation scatter from (lon, lat, ip) tuples.
+    """
     plt.figure(figsize=(8, 4))
     if positions:
         lons = [p[0] for p in positions]
@@ -97,11 +81,42 @@ def create_charts(df, outdir="reports_assets"):
         plt.text(0.5, 0.5, "No geolocation data", ha="center")
         plt.axis("off")
     plt.tight_layout()
-    plt.savefig(world_path, dpi=150)
+    plt.savefig(path, dpi=150)
     plt.close()
-    assets["world_map"] = world_path
+    return path
 
-    return assets
+
+def create_charts(df, outdir="reports_assets"):
+    """
+    Create and save charts used in the PDF from an events DataFrame or EventViews.
+    Returns dict of image filenames.
+
+    The data for each chart is aggregated here once; each _render_* function
+    then only draws and saves its own figure.
+    """
+    os.makedirs(outdir, exist_ok=True)
+    views = as_views(df)
+    fails = views.fails
+
+    # Histogram: failed logins by IP
+    counts = fails.groupby("ip", observed=True).size().sort_values(ascending=False)
+
+    # Time-series: failed logins over time
+    if not fails.empty:
+        ts = fails.set_index(pd.to_datetime(fails["timestamp"]))
+        ts_count = ts.resample("1T").size()
+    else:
+        ts_count = pd.Series(dtype="int64")
+
+    # World map scatter (very simple using scatter plot with mock geolocations)
+    # One lookup per distinct failed-login IP
+    positions = [(r.lon, r.lat, r.ip) for r in build_geo_table(views.ip_values).reset_index().itertuples()]
+
+    return {
+        "hist_failures_by_ip": _render_hist(counts, os.path.join(outdir, "hist_failures_by_ip.png")),
+        "ts_failures": _render_ts(ts_count, os.path.join(outdir, "ts_failures.png")),
+        "world_map": _render_world(positions, os.path.join(outdir, "world_map.png")),
+    }
 
 
 def generate_pdf_report(events_csv="events_extracted.csv", output_pdf="bruteforce_report.pdf"):
@@ -112,19 +127,12 @@ def generate_pdf_report(events_csv="events_extracted.csv", output_pdf="bruteforc
     - List of flagged brute-force attempts
     - ML-anomalies summary
     """
-    # Load events
-    if not os.path.exists(events_csv):
-        logger.info("Events CSV not found; extracting from sample logs.")
-        df = extract()
-    else:
-        df = pd.read_csv(events_csv, parse_dates=["timestamp"])
-
-    # Create alerts and anomalies
-    alerts = detect_bruteforce(df)
-    anomalies = detect_anomalous_ips(df, window_minutes=120, contamination=0.1).reset_index()
+    # Load events, failed-login views, alerts and anomalies (disk-cached per CSV version)
+    df, views, alerts, anomalies = load_pipeline(events_csv, window_minutes=120, contamination=0.1)
+    anomalies = anomalies.reset_index()
 
     # Create chart assets
-    assets = create_charts(df)
+    assets = create_charts(views)
 
     # Build PDF
     c = canvas.Canvas(output_pdf, pagesize=landscape(A4))
@@ -4,21 +4,31 @@ Offline/mock GeoIP lookup.
 To keep the project runnable offline, we provide a small mock GeoIP mapping
 embedded as JSON-like structures.
 
-Function:
-- geo_lookup(ip) -> dict with country, region, city, lat, lon
+Functions:
+- geo_lookup(ip) -> read-only mapping with country, region, city, lat, lon (memoized)
+- geo_lookup_many(ips) -> DataFrame with the same fields for a Series of IPs
+- build_geo_table(ips) -> DataFrame of the same fields indexed by unique IP
 
-The mapping matches certain example IPs from sample logs.
+The mapping matches certain example IPs from sample logs. Networks are compiled
+at import time into sorted integer ranges so lookups are a binary search
+(np.searchsorted) instead of a string-prefix scan.
 """
 
-from ipaddress import ip_address, IPv4Address
+from functools import lru_cache
+from types import MappingProxyType
+from ipaddress import ip_network, IPv4Address
+import numpy as np
+import pandas as pd
 from .utils import get_logger
 
 logger = get_logger("geolocation")
 
-# Mock IP to location mapping (CIDR-like prefixes supported via startswith for demo)
+GEO_FIELDS = ["country", "region", "city", "lat", "lon"]
+
+# Mock IP to location mapping (IPv4 CIDR networks, assumed non-overlapping)
 MOCK_GEO_DATA = [
     {
-        "prefix": "203.0.113.",
+        "network": "203.0.113.0/24",
         "country": "Exampleland",
         "region": "East Example",
         "city": "Exville",
@@ -26,7 +36,7 @@ MOCK_GEO_DATA = [
         "lon": -118.25
     },
     {
-        "prefix": "198.51.100.",
+        "network": "198.51.100.0/24",
         "country": "Testonia",
         "region": "North Test",
         "city": "Test City",
@@ -34,7 +44,7 @@ MOCK_GEO_DATA = [
         "lon": -0.13
     },
     {
-        "prefix": "192.0.2.",
+        "network": "192.0.2.0/24",
         "country": "Mockistan",
         "region": "Central Mock",
         "city": "Mock City",
@@ -43,37 +53,103 @@ MOCK_GEO_DATA = [
     }
 ]
 
+UNKNOWN_GEO = {
+    "country": "Unknown",
+    "region": "Unknown",
+    "city": "Unknown",
+    "lat": 0.0,
+    "lon": 0.0
+}
+
 
-def geo_lookup(ip):
+def _build_range_table(records):
     """
-    Lookup IP in the mock table. Returns a dict.
-    If not found or IP invalid, returns unknown placeholders.
+    Compile network records into (starts, ends, rows) sorted by range start.
+    `rows` is a DataFrame of GEO_FIELDS whose last row holds UNKNOWN_GEO, so a
+    miss can be resolved by indexing position len(records).
     """
-    result = {
-        "country": "Unknown",
-        "region": "Unknown",
-        "city": "Unknown",
-        "lat": 0.0,
-        "lon": 0.0
-    }
-    if not ip:
-        return result
+    ranges = []
+    for rec in records:
+        net = ip_network(rec["network"])
+        ranges.append((int(net.network_address), int(net.broadcast_address), rec))
+    ranges.sort(key=lambda r: r[0])
+    starts = np.array([r[0] for r in ranges], dtype=np.uint32)
+    ends = np.array([r[1] for r in ranges], dtype=np.uint32)
+    rows = pd.DataFrame([{k: r[2][k] for k in GEO_FIELDS} for r in ranges] + [UNKNOWN_GEO],
+                        columns=GEO_FIELDS)
+    return starts, ends, rows
+
+
+_STARTS, _ENDS, _GEO_ROWS = _build_range_table(MOCK_GEO_DATA)
+# Immutable per-row records so cached lookups can share them without copying
+_GEO_RECORDS = [MappingProxyType(rec) for rec in _GEO_ROWS.to_dict("records")]
+_MISS = len(_STARTS)
+
+
+def _ip_to_int(ip):
+    """
+    Convert an IPv4 string to its integer value, or -1 if empty/invalid/IPv6.
+    """
+    if not ip or not isinstance(ip, str):
+        return -1
     try:
-        # Validate IP
-        ip_address(ip)
-    except Exception:
-        logger.debug("Invalid IP passed to geo_lookup.")
-        return result
-    for rec in MOCK_GEO_DATA:
-        if ip.startswith(rec["prefix"]):
-            return {
-                "country": rec["country"],
-                "region": rec["region"],
-                "city": rec["city"],
-                "lat": rec["lat"],
-                "lon": rec["lon"]
-            }
-    return result
+        return int(IPv4Address(ip))
+    except ValueError:
+        return -1
+
+
+def _locate(ip_ints):
+    """
+    Map an int64 array of IPv4 integers (-1 for invalid) to row positions in
+    _GEO_ROWS; misses map to _MISS.
+    """
+    if not _MISS:
+        return np.full(len(ip_ints), _MISS)
+    idx = np.searchsorted(_STARTS, ip_ints, side="right") - 1
+    safe = idx.clip(0)
+    hit = (idx >= 0) & (ip_ints >= 0) & (ip_ints <= _ENDS[safe])
+    return np.where(hit, safe, _MISS)
+
+
+def geo_lookup_many(ips):
+    """
+    Vectorized lookup for a Series (or iterable) of IPs.
+    Returns a DataFrame with GEO_FIELDS columns, aligned to the input index.
+    """
+    ips = pd.Series(ips, dtype=object) if not isinstance(ips, pd.Series) else ips
+    ip_ints = np.fromiter((_ip_to_int(ip) for ip in ips), dtype=np.int64, count=len(ips))
+    out = _GEO_ROWS.iloc[_locate(ip_ints)]
+    out.index = ips.index
+    return out
+
+
+def build_geo_table(ips):
+    """
+    Build an ip -> geo table for an iterable of IPs (duplicates and nulls dropped).
+    Returns a DataFrame with GEO_FIELDS columns indexed by "ip".
+    """
+    uniq = pd.Series(pd.unique(pd.Series(list(ips), dtype=object).dropna()), dtype=object)
+    table = geo_lookup_many(uniq)
+    table.index = pd.Index(uniq, name="ip")
+    return table
+
+
+def _geo_lookup_impl(ip):
+    """
+    Lookup IP in the mock table. Returns a read-only mapping.
+    If not found or IP invalid, returns unknown placeholders.
+    """
+    ip_int = _ip_to_int(ip)
+    if ip_int < 0:
+        if ip:
+            logger.debug("Invalid IP passed to geo_lookup.")
+        return _GEO_RECORDS[_MISS]
+    pos = int(_locate(np.array([ip_int], dtype=np.int64))[0])
+    return _GEO_RECORDS[pos]
+
+
+# Memoized scalar lookup; call geo_lookup.cache_clear() when the data is reloaded.
+geo_lookup = lru_cache(maxsize=65536)(_geo_lookup_impl)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+"""
+Loading helpers for extracted event files.
+
+- load_events(path): read events_extracted.csv in chunks with compact dtypes
+  (int32 event_id, categorical string columns) and keep a Parquet twin next
+  to it so repeated loads skip CSV/datetime parsing.
+
+Parquet support needs pyarrow; without it the CSV is always read.
+"""
+
+import os
+import pandas as pd
+from .utils import get_logger
+
+logger = get_logger("io")
+
+CSV_CHUNKSIZE = 250_000
+# Columns used downstream; raw_event is skipped on load (it dominates file size)
+LOAD_COLUMNS = ["timestamp", "event_id", "event_type", "username", "ip", "status"]
+CSV_DTYPES = {
+    "event_id": "int32",
+    "event_type": "category",
+    "ip": "category",
+    "username": "category",
+    "status": "category",
+}
+# Low-cardinality string columns stored as pandas categoricals throughout the pipeline
+CATEGORY_COLUMNS = ["event_type", "ip", "username", "status"]
+
+
+def parquet_twin(path):
+    """
+    Return the Parquet sidecar path for an events CSV (same name, .parquet suffix).
+    """
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def _read_csv_chunked(path):
+    """
+    Stream the CSV in chunks and concatenate; categories are re-unified at the end
+    because per-chunk categoricals with different categories concat to object.
+    """
+    chunks = pd.read_csv(path, chunksize=CSV_CHUNKSIZE, usecols=LOAD_COLUMNS,
+                         parse_dates=["timestamp"], dtype=CSV_DTYPES)
+    df = pd.concat(chunks, ignore_index=True)
+    for c in CATEGORY_COLUMNS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    return df
+
+
+def load_events(path):
+    """
+    Load an extracted events CSV (LOAD_COLUMNS only; raw_event is not read).
+
+    If a Parquet twin exists and is at least as new as the CSV it is read
+    directly (typed columns, no parsing). Otherwise the CSV is read in chunks
+    and the Parquet twin is (re)written for the next load; a failed write is
+    logged and does not affect the returned frame.
+    """
+    twin = parquet_twin(path)
+    if os.path.exists(twin) and os.path.getmtime(twin) >= os.path.getmtime(path):
+        try:
+            return pd.read_parquet(twin, columns=LOAD_COLUMNS)
+        except ImportError:
+            logger.warning("pyarrow not installed; reading events from CSV.")
+        except Exception:
+            logger.exception(f"Failed to read {twin}; falling back to CSV.")
+
+    df = _read_csv_chunked(path)
+    try:
+        df.to_parquet(twin, compression="snappy", index=False)
+        logger.info(f"Cached events as Parquet at {twin}")
+    except ImportError:
+        logger.warning("pyarrow not installed; skipping Parquet cache.")
+    except Exception as e:
+        # The twin is only a cache; the CSV has already been read
+        logger.warning(f"Could not write Parquet cache {twin}: {e}")
+    return df
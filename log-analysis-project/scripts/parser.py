@@ -2,24 +2,52 @@
 Log parser module.
 
 Responsibilities:
-- Read XML-style event logs (and provide a fallback stub for .evtx using python-evtx if installed)
+- Read XML-style event logs (and provide a fallback stub for .evtx using python-evtx if installed),
+  using lxml when it is installed and the standard-library ElementTree otherwise
 - Extract canonical fields: timestamp (UTC), event_id, username, ip, status
 - Return a pandas DataFrame with normalized columns
 """
 
-from xml.etree import ElementTree as ET
+try:
+    # lxml's libxml2 parser is ElementTree-compatible and considerably faster
+    from lxml import etree as ET
+    # Like the stdlib parser, never expand external entities or fetch DTDs from a log file
+    # (older lxml releases resolve them by default)
+    _PARSER_OPTIONS = {"resolve_entities": False, "no_network": True}
+    _XML_PARSER = ET.XMLParser(**_PARSER_OPTIONS)
+except ImportError:
+    from xml.etree import ElementTree as ET
+    _PARSER_OPTIONS = {}
+    _XML_PARSER = None
 from datetime import datetime, timezone
 import os
-import glob
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
 import pandas as pd
-from .utils import xml_field, clean_timestamp, extract_ip_safe, get_logger
+from .utils import clean_timestamp, extract_ip_safe, extract_ips_batch, get_logger
 
 logger = get_logger("parser")
 
 EXPECTED_FIELDS = ["timestamp", "event_id", "username", "ip", "status", "raw_event"]
+# Total log size from which parse_directory spreads files over worker processes
+PARALLEL_PARSE_MIN_BYTES = 8 * 1024 * 1024
+_EVENT_ID_MIN, _EVENT_ID_MAX = int(np.iinfo(np.int32).min), int(np.iinfo(np.int32).max)
+# EventData <Data Name="..."> -> canonical field. Names are matched as written
+# first, then case-insensitively through the lowercased keys.
+_FIELD_MAP = {
+    "TargetUserName": "username",
+    "UserName": "username",
+    "AccountName": "username",
+    "IpAddress": "ip",
+    "Ip": "ip",
+    "Status": "status",
+    "Result": "status",
+}
+_FIELD_MAP.update({name.lower(): field for name, field in list(_FIELD_MAP.items())})
 
 
-def parse_event_element(event_elem):
+def parse_event_element(event_elem, include_raw=False):
     """
     Given an <Event> XML element (simplified schema), extract fields.
     Supports:
@@ -28,7 +56,10 @@ def parse_event_element(event_elem):
       - Event/EventData/Data Name="TargetUserName" (or child TargetUserName)
       - Event/EventData/Data Name="IpAddress"
       - Any Data Name="Status" or assume based on EventID
-    Returns dict with canonical keys.
+    raw_event is the serialized element when include_raw is True, "" otherwise
+    (serializing every event is a large share of parse time).
+    Returns a tuple of field values in EXPECTED_FIELDS order; timestamp and ip
+    are the raw strings, normalized column-wide by parse_directory.
     """
     # System block
     system = event_elem.find("System")
@@ -41,11 +72,14 @@ def parse_event_element(event_elem):
                 event_id = int(eid.text.strip())
             except Exception:
                 event_id = None
+            # event_id is stored as int32; out-of-range values count as unparseable
+            if event_id is not None and not _EVENT_ID_MIN <= event_id <= _EVENT_ID_MAX:
+                event_id = None
         timecreated = system.find("TimeCreated")
         if timecreated is not None:
             # TimeCreated may be an element with attribute SystemTime
-            st = timecreated.attrib.get("SystemTime") or timecreated.text or ""
-            timestamp = clean_timestamp(st)
+            # Kept as the raw string; parse_directory converts the whole column at once
+            timestamp = timecreated.attrib.get("SystemTime") or timecreated.text or ""
 
     # EventData block (many Windows XML logs use <EventData><Data Name="...">value</Data></EventData>)
     eventdata = event_elem.find("EventData")
@@ -53,52 +87,60 @@ def parse_event_element(event_elem):
     ip = ""
     status = ""
     if eventdata is not None:
-        # Try to find Data elements by Name attribute
-        for data in eventdata.findall("Data"):
-            name = data.attrib.get("Name") or ""
-            text = (data.text or "").strip()
-            if name.lower() in ("targetusername", "username", "accountname"):
-                username = text
-            elif name.lower() in ("ipaddress", "ip"):
-                ip = extract_ip_safe(text)
-            elif name.lower() in ("status", "result"):
-                status = text
-        # fallback: find child tags like <TargetUserName>
-        if not username:
-            username = xml_field(eventdata, "TargetUserName", "")
-        if not ip:
-            ip = xml_field(eventdata, "IpAddress", "")
-            ip = extract_ip_safe(ip)
+        # One pass over the children: <Data Name="..."> mapped to a field via _FIELD_MAP
+        # (last one wins), plus direct child tags like <TargetUserName> (first one wins,
+        # as find() did)
+        fields = {}
+        child_map = {}
+        for d in eventdata:
+            if d.tag == "Data":
+                name = d.attrib.get("Name") or ""
+                field = _FIELD_MAP.get(name) or _FIELD_MAP.get(name.lower())
+                if field:
+                    fields[field] = (d.text or "").strip()
+            elif d.tag in ("TargetUserName", "IpAddress"):
+                child_map.setdefault(d.tag, d.text or "")
+        username = fields.get("username") or child_map.get("TargetUserName") or ""
+        # The Data value is validated here so that a placeholder or invalid address
+        # falls back to the <IpAddress> child tag; the child text stays raw and
+        # parse_directory validates the whole ip column at once.
+        ip = extract_ip_safe(fields.get("ip", "")) or child_map.get("IpAddress") or ""
+        status = fields.get("status", "")
     # final normalize
-    return {
-        "timestamp": timestamp,
-        "event_id": event_id,
-        "username": username or "",
-        "ip": ip or "",
-        "status": status or "",
-        "raw_event": ET.tostring(event_elem, encoding="unicode"),
-    }
+    return (
+        timestamp,
+        event_id,
+        username or "",
+        ip or "",
+        status or "",
+        ET.tostring(event_elem, encoding="unicode") if include_raw else "",
+    )
 
 
-def parse_xml_file(filepath):
+def parse_xml_file(filepath, include_raw=False):
     """
-    Parse an XML logfile path into list of events (dicts).
+    Stream an XML logfile, yielding one event tuple per <Event>.
+
+    Uses iterparse and clears each <Event> once it has been parsed, so memory
+    stays bounded by a single event instead of the whole document. On a parse
+    error the problem is logged and iteration stops.
     """
     logger.info(f"Parsing XML file: {filepath}")
     try:
-        tree = ET.parse(filepath)
-        root = tree.getroot()
-        events = []
+        context = ET.iterparse(filepath, events=("start", "end"), **_PARSER_OPTIONS)
+        _, root = next(context)
         # Accept either <Events><Event>... or direct multiple Event children
-        for ev in root.findall(".//Event"):
-            events.append(parse_event_element(ev))
-        return events
+        for event, elem in context:
+            if event == "end" and elem.tag == "Event":
+                yield parse_event_element(elem, include_raw)
+                elem.clear()
+                # Drop the root's references to already-processed events
+                root.clear()
     except ET.ParseError as e:
         logger.error(f"Failed to parse XML file {filepath}: {e}")
-        return []
 
 
-def parse_evtx_file(filepath):
+def parse_evtx_file(filepath, include_raw=False):
     """
     Attempt to parse .evtx using python-evtx if installed.
     If the dependency is missing, this function returns an empty list.
@@ -116,9 +158,9 @@ def parse_evtx_file(filepath):
             xml = evtx_file_xml_view(evtx)
             # xml is a single string containing many <Event> entries — parse as XML
             try:
-                root = ET.fromstring("<Events>" + xml + "</Events>")
+                root = ET.fromstring("<Events>" + xml + "</Events>", parser=_XML_PARSER)
                 for ev in root.findall(".//Event"):
-                    events.append(parse_event_element(ev))
+                    events.append(parse_event_element(ev, include_raw))
             except ET.ParseError:
                 logger.exception("Failed to parse .evtx XML view. Skipping.")
     except Exception:
@@ -126,44 +168,96 @@ def parse_evtx_file(filepath):
     return events
 
 
-def parse_directory(dirpath):
+def _to_frame(events):
+    """
+    Build a DataFrame from a file's event tuples, one column list per field.
+    timestamp and ip are still raw strings here; event_id is int32 (missing -> 0),
+    which holds any Windows event ID.
+    """
+    columns = [list(values) for values in zip(*events)] or [[] for _ in EXPECTED_FIELDS]
+    ts, eid, user, ip, status, raw = columns
+    return pd.DataFrame({
+        "timestamp": ts,
+        "event_id": np.fromiter((e or 0 for e in eid), dtype="int32", count=len(eid)),
+        "username": user,
+        "ip": ip,
+        "status": status,
+        "raw_event": raw,
+    })
+
+
+def _parse_one(filepath, include_raw=False):
+    """
+    Parse a single .xml or .evtx file into a DataFrame (see _to_frame); runs in worker processes.
+    """
+    if filepath.lower().endswith(".xml"):
+        return _to_frame(list(parse_xml_file(filepath, include_raw)))
+    if filepath.lower().endswith(".evtx"):
+        return _to_frame(parse_evtx_file(filepath, include_raw))
+    return _to_frame([])
+
+
+def _parse_timestamps(raw):
+    """
+    Convert a Series of raw TimeCreated strings to UTC datetimes in one vectorized call.
+    Only strings that this parse rejects are retried with clean_timestamp.
+
+    format="mixed" parses each string on its own, so naive strings are taken as
+    UTC (as clean_timestamp does). format="ISO8601" would instead give them the
+    offset of an earlier offset-bearing string, possibly from another file.
+    """
+    ts = pd.to_datetime(raw, format="mixed", utc=True, errors="coerce")
+    retry = ts.isna() & raw.astype(bool)
+    if retry.any():
+        ts[retry] = pd.to_datetime(raw[retry].map(clean_timestamp), utc=True)
+    return ts
+
+
+def parse_directory(dirpath, include_raw=False):
     """
     Parse all .xml and .evtx files in a directory (non-recursive).
     Returns a pandas DataFrame with canonical columns and timestamp converted to UTC datetime.
+    raw_event is left empty unless include_raw is True.
     """
-    files = glob.glob(os.path.join(dirpath, "*.xml")) + glob.glob(os.path.join(dirpath, "*.evtx"))
-    all_events = []
-    for f in files:
-        if f.lower().endswith(".xml"):
-            evs = parse_xml_file(f)
-            all_events.extend(evs)
-        elif f.lower().endswith(".evtx"):
-            evs = parse_evtx_file(f)
-            all_events.extend(evs)
-    if not all_events:
+    # Single directory scan; sorted so row order does not depend on the filesystem
+    try:
+        with os.scandir(dirpath) as it:
+            entries = sorted(
+                (e.path, e.stat().st_size) for e in it
+                if e.is_file() and not e.name.startswith(".") and e.name.lower().endswith((".xml", ".evtx"))
+            )
+    except FileNotFoundError:
+        entries = []
+    files = [path for path, _ in entries]
+    if len(files) > 1 and sum(size for _, size in entries) >= PARALLEL_PARSE_MIN_BYTES:
+        # Files are independent, so parse them in parallel (one file per task); below
+        # the size threshold, starting the pool costs more than it saves
+        with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as ex:
+            frames = list(ex.map(partial(_parse_one, include_raw=include_raw), files))
+    else:
+        frames = [_parse_one(f, include_raw) for f in files]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
         logger.info("No events found in directory.")
         return pd.DataFrame(columns=EXPECTED_FIELDS)
-    # Build DataFrame
-    df = pd.DataFrame(all_events)
-    # Ensure timestamp column is datetime; some rows may be None
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    # Fill missing event_id with 0
-    df["event_id"] = df["event_id"].fillna(0).astype(int)
-    # normalize columns
-    for c in ["username", "ip", "status"]:
-        if c in df.columns:
-            df[c] = df[c].fillna("")
+    df = pd.concat(frames, ignore_index=True)
+    # Column-wide normalization over all files at once
+    # Log timestamps are second-granularity; sub-second digits are truncated
+    df["timestamp"] = _parse_timestamps(df["timestamp"]).astype("datetime64[s, UTC]")
+    df["ip"] = extract_ips_batch(df["ip"].tolist())
     # add derived column: outcome based on event_id if status missing
-    def derive_status(row):
-        if row["status"]:
-            return row["status"]
-        if row["event_id"] == 4625:
-            return "Failure"
-        if row["event_id"] == 4624:
-            return "Success"
-        return "Unknown"
-    df["status"] = df.apply(derive_status, axis=1)
-    return df[EXPECTED_FIELDS]
+    df["status"] = np.select(
+        [df["status"].astype(bool), df["event_id"].eq(4625), df["event_id"].eq(4624)],
+        [df["status"], "Failure", "Success"],
+        default="Unknown",
+    )
+    # Few distinct values repeated over many rows: store as categoricals
+    for c in ("status", "username", "ip"):
+        df[c] = df[c].astype("category")
+    # _to_frame already builds columns in EXPECTED_FIELDS order, so no reordering copy
+    # (the check is skipped under python -O)
+    assert list(df.columns) == EXPECTED_FIELDS
+    return df
 
 
 if __name__ == "__main__":
@@ -172,7 +266,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Parse XML/.evtx logs into a normalized CSV.")
     parser.add_argument("input_dir", nargs="?", default="../data/sample_logs", help="Directory of logs")
     parser.add_argument("output_csv", nargs="?", default="parsed_events.csv", help="Output CSV file")
+    parser.add_argument("--include-raw", action="store_true", help="Keep each event's XML in the raw_event column")
     args = parser.parse_args()
-    df = parse_directory(args.input_dir)
+    df = parse_directory(args.input_dir, include_raw=args.include_raw)
     df.to_csv(args.output_csv, index=False)
     logger.info(f"Wrote parsed events to {args.output_csv}")
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Shared views over extracted events for the detection and reporting steps.
+
+build_views(df) filters failed logins once and precomputes what the
+downstream steps need, so detect_bruteforce, detect_anomalous_ips and
+create_charts do not each copy the failure subset and re-parse timestamps:
+
+- fails: failed-login rows with parsed timestamps, sorted by time (NaT dropped)
+- fails_ts_ns: int64 nanosecond timestamps aligned with `fails`
+- ip_codes / user_codes: int32 factorized codes (-1 for missing values)
+- ip_values / user_values: the value for each code
+
+Geolocation is not part of the views (detection does not need it); chart
+callers build it from ip_values with geolocation.build_geo_table.
+
+Functions taking events accept either a DataFrame or an EventViews (see as_views).
+"""
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+EventViews = namedtuple(
+    "EventViews", ["fails", "fails_ts_ns", "ip_codes", "ip_values", "user_codes", "user_values"]
+)
+
+
+def _factorize(col):
+    codes, uniques = pd.factorize(col)
+    return codes.astype(np.int32), np.asarray(uniques, dtype=object)
+
+
+def build_views(df):
+    """
+    Build EventViews for an events DataFrame (must have timestamp, event_type, username, ip).
+    """
+    fails = df[df["event_type"] == "failed_login"].copy()
+    fails["timestamp"] = pd.to_datetime(fails["timestamp"])
+    fails = fails[fails["timestamp"].notna()].sort_values("timestamp")
+    ts_ns = fails["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+    ip_codes, ip_values = _factorize(fails["ip"])
+    user_codes, user_values = _factorize(fails["username"])
+    return EventViews(fails, ts_ns, ip_codes, ip_values, user_codes, user_values)
+
+
+def as_views(data):
+    """
+    Return `data` unchanged if it is already an EventViews, otherwise build one.
+    """
+    return data if isinstance(data, EventViews) else build_views(data)
+
+
+def iter_code_groups(codes, min_size=1):
+    """
+    Yield (code, positions) for each non-negative code with at least `min_size`
+    rows, positions in original order.
+
+    Smaller groups are dropped before sorting, so callers with a detection
+    threshold only pay for candidate groups. A stable argsort keeps rows
+    time-ordered within each group when `codes` is aligned with the
+    time-sorted `fails` view.
+    """
+    valid = codes >= 0
+    if not valid.any():
+        return
+    sizes = np.bincount(codes[valid])
+    candidates = np.flatnonzero(valid & (sizes[np.where(valid, codes, 0)] >= min_size))
+    if len(candidates) == 0:
+        return
+    order = candidates[np.argsort(codes[candidates], kind="stable")]
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    for positions in np.split(order, bounds):
+        yield int(codes[positions[0]]), positions
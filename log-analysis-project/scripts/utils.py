@@ -5,19 +5,31 @@ Contains:
 - xml_field: safe XML field extractor
 - clean_timestamp: parse and normalize timestamps (UTC-aware)
 - extract_ip_safe: validate and sanitize IP addresses
+- extract_ips_batch: extract_ip_safe over a column of values (Hyperscan-accelerated if installed)
 - get_logger: simple logging wrapper
+
+hyperscan is an optional accelerator (not in requirements.txt); without it
+extract_ips_batch validates each distinct value with extract_ip_safe.
 """
 
 import re
 import logging
+from functools import lru_cache
 from datetime import datetime, timezone
-from ipaddress import ip_address, AddressValueError
+from ipaddress import ip_address
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 ISO_FORMATS = [
     "%Y-%m-%dT%H:%M:%SZ",
     "%Y-%m-%dT%H:%M:%S.%fZ",
     "%Y-%m-%d %H:%M:%S",
 ]
+# Fast path for the common 'YYYY-MM-DD[T ]HH:MM:SS[.fraction][Z]' shape (no UTC offset)
+_TS_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?Z?")
 
 
 def xml_field(elem, tagname, default=""):
@@ -35,13 +47,25 @@ def xml_field(elem, tagname, default=""):
     return child.text or default
 
 
+@lru_cache(maxsize=65536)
 def clean_timestamp(timestr):
     """
     Normalize a timestamp string into a timezone-aware UTC datetime object.
     Tries multiple known formats. Returns None on failure.
+    Results are memoized, since event batches repeat the same SystemTime strings.
     """
     if not timestr:
         return None
+    m = _TS_RE.fullmatch(timestr)
+    if m:
+        y, mo, d, h, mi, sec, frac = m.groups()
+        # Windows SystemTime carries 7 fractional digits; datetime keeps 6
+        us = int(frac[:6].ljust(6, "0")) if frac else 0
+        try:
+            return datetime(int(y), int(mo), int(d), int(h), int(mi), int(sec), us, tzinfo=timezone.utc)
+        except ValueError:
+            # Out-of-range fields; let the slower parsers decide
+            pass
     # If it is an attribute string like '2025-11-30T12:00:01Z', return parsed
     for fmt in ISO_FORMATS:
         try:
@@ -61,9 +85,19 @@ def clean_timestamp(timestr):
         return None
 
 
-IPV4_RE = re.compile(
-    r"^(?:(?:25[0-5]|2[0-4]\d|1?\d{1,2})\.){3}(?:25[0-5]|2[0-4]\d|1?\d{1,2})$"
-)
+# Shape-only dotted quad (no nested alternation to backtrack into); octet ranges
+# are checked afterwards by _ipv4_octets_ok
+IPV4_RE = re.compile(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$", re.ASCII)
+
+# Some windows events may include '::1' or '-' placeholders; "" covers whitespace-only input
+_IP_PLACEHOLDERS = frozenset({"-", "127.0.0.1", "::1", ""})
+
+
+def _ipv4_octets_ok(ip_str):
+    """
+    True if every octet of an IPV4_RE match is 0-255 without leading zeros (as ipaddress requires).
+    """
+    return all(int(o) < 256 and (o == "0" or o[0] != "0") for o in ip_str.split("."))
 
 
 def extract_ip_safe(ip_str):
@@ -74,21 +108,80 @@ def extract_ip_safe(ip_str):
     if not ip_str:
         return ""
     ip_str = ip_str.strip()
-    # Some windows events may include '::1' or '-' placeholders
-    if ip_str in ("-", "127.0.0.1", "::1"):
+    if ip_str in _IP_PLACEHOLDERS:
         return ""
+    # Fast path: dotted-quad IPv4 needs no ipaddress object
+    if IPV4_RE.match(ip_str) and _ipv4_octets_ok(ip_str):
+        return ip_str
     try:
         # Will raise on invalid input
         ip_addr = ip_address(ip_str)
         # Normalize IPv4-mapped IPv6 if present
         return ip_addr.exploded
-    except AddressValueError:
-        # Try regex fallback
-        if IPV4_RE.match(ip_str):
-            return ip_str
+    except ValueError:
+        # ip_address raises a plain ValueError (AddressValueError is a subclass)
         return ""
 
 
+def _compile_ipv4_db():
+    """
+    Compile IPV4_RE into a Hyperscan database matching whole lines of a newline-joined batch.
+    """
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[IPV4_RE.pattern.encode()],
+        ids=[0],
+        flags=[hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SOM_LEFTMOST],
+    )
+    return db
+
+
+_IPV4_DB = _compile_ipv4_db() if hyperscan is not None else None
+
+
+def _ipv4_matches(candidates):
+    """
+    Return the indices of `candidates` that match IPV4_RE, using a single Hyperscan scan.
+    """
+    encoded = [c.encode() for c in candidates]
+    line_index = {}
+    pos = 0
+    for i, b in enumerate(encoded):
+        line_index[pos] = i
+        pos += len(b) + 1
+    hits = set()
+
+    def on_match(_id, start, _end, _flags, _context):
+        hits.add(line_index[start])
+
+    _IPV4_DB.scan(b"\n".join(encoded), match_event_handler=on_match)
+    return hits
+
+
+def extract_ips_batch(values):
+    """
+    Apply extract_ip_safe to a sequence of raw IP strings; returns a list aligned with `values`.
+    Each distinct value is validated once. With hyperscan installed, the IPv4
+    check for all distinct values is one DFA scan; otherwise (and for whatever
+    the scan does not match, e.g. IPv6) extract_ip_safe is used per value.
+    """
+    memo = dict.fromkeys(values)
+    candidates = []
+    for raw in memo:
+        ip_str = raw.strip() if raw else ""
+        if ip_str in _IP_PLACEHOLDERS:
+            memo[raw] = ""
+        elif _IPV4_DB is not None and "\n" not in ip_str:
+            candidates.append((raw, ip_str))
+        else:
+            memo[raw] = extract_ip_safe(ip_str)
+    if candidates:
+        hits = _ipv4_matches([ip_str for _, ip_str in candidates])
+        for i, (raw, ip_str) in enumerate(candidates):
+            memo[raw] = ip_str if i in hits and _ipv4_octets_ok(ip_str) else extract_ip_safe(ip_str)
+    return [memo[v] for v in values]
+
+
 def get_logger(name="log_analysis"):
     """
     Returns a configured logger for the project with INFO level and a simple format.
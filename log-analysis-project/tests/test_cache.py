@@ -0,0 +1,24 @@
+"""
+Tests for the cached pipeline entry point in scripts/cache.py.
+
+This checks that load_pipeline returns empty, correctly shaped results when
+extraction finds no events, instead of failing on the empty frame.
+"""
+
+from functools import partial
+from scripts import cache
+from scripts.extract_events import extract
+
+
+def test_load_pipeline_empty_log_directory(tmp_path, monkeypatch):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cache, "extract", partial(extract, input_dir=str(logs)))
+    events, views, alerts, anomalies = cache.load_pipeline(str(tmp_path / "events.csv"))
+    assert events.empty and "event_type" in events.columns
+    assert views.fails.empty
+    assert alerts.empty
+    assert anomalies.empty
+    # Nothing was extracted, so no CSV is written
+    assert not (tmp_path / "events.csv").exists()
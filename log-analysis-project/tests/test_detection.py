@@ -5,9 +5,12 @@ This creates a small synthetic dataset to test whether the detect_bruteforce
 function flags an IP that has >= 5 failures within 2 minutes.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
-from scripts.detect_bruteforce import detect_bruteforce
+from scripts.detect_bruteforce import detect_bruteforce, _window_hits_kernel, _window_hits_numpy
+from scripts.pipeline import build_views
+
 
 def make_synthetic():
     base = datetime.now(timezone.utc)
@@ -35,10 +38,44 @@ def make_synthetic():
     })
     return pd.DataFrame(rows)
 
+
 def test_detect_ip_bruteforce():
     df = make_synthetic()
     alerts = detect_bruteforce(df)
     # we expect at least one ip-type alert covering 203.0.113.50
     assert not alerts.empty, "Alerts should be detected"
     ips = alerts[alerts["flag_type"] == "ip"]["flag_value"].tolist()
-    assert "203.0.113.50" in ips, "Synthetic IP with 6 rapid failures should be flagged"
\ No newline at end of file
+    assert "203.0.113.50" in ips, "Synthetic IP with 6 rapid failures should be flagged"
+
+
+def test_window_alerts_do_not_overlap():
+    base = datetime.now(timezone.utc)
+    rows = [{
+        "timestamp": base + timedelta(seconds=5 * i),
+        "event_id": 4625,
+        "event_type": "failed_login",
+        "username": "admin",
+        "ip": "198.51.100.7",
+        "status": "Failure",
+        "raw_event": ""
+    } for i in range(12)]
+    alerts = detect_bruteforce(pd.DataFrame(rows))
+    ip_alerts = alerts[alerts["flag_type"] == "ip"]
+    # 12 rapid failures => two non-overlapping windows of 5, remainder of 2 ignored
+    assert ip_alerts["count"].tolist() == [5, 5]
+    assert ip_alerts["first_seen"].iloc[1] > ip_alerts["last_seen"].iloc[0]
+
+
+def test_window_kernel_matches_numpy_scan():
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        ts = np.sort(rng.integers(0, 600, size=rng.integers(0, 60))).astype("int64") * 10**9
+        starts, ends, _ = _window_hits_kernel(ts, 120 * 10**9, 5)
+        assert list(zip(starts.tolist(), ends.tolist())) == _window_hits_numpy(ts, 120 * 10**9, 5)
+
+
+def test_detect_accepts_prebuilt_views():
+    df = make_synthetic()
+    from_df = detect_bruteforce(df)
+    from_views = detect_bruteforce(build_views(df))
+    assert from_df[["flag_type", "flag_value", "count"]].equals(from_views[["flag_type", "flag_value", "count"]])
@@ -0,0 +1,30 @@
+"""
+Test for the offline GeoIP range-table lookup.
+
+This checks that the scalar geo_lookup and the vectorized geo_lookup_many
+agree, including for unknown and invalid IPs.
+"""
+
+import pandas as pd
+from scripts.geolocation import geo_lookup, geo_lookup_many, build_geo_table
+
+
+def test_geo_lookup_matches_network():
+    assert geo_lookup("203.0.113.10")["country"] == "Exampleland"
+    assert geo_lookup("192.0.2.255")["city"] == "Mock City"
+    assert geo_lookup("8.8.8.8")["country"] == "Unknown"
+    assert geo_lookup("not-an-ip")["country"] == "Unknown"
+
+
+def test_geo_lookup_many_agrees_with_scalar():
+    ips = pd.Series(["198.51.100.22", "", "203.0.113.10", "::1", "203.0.114.1"])
+    table = geo_lookup_many(ips)
+    assert list(table.index) == list(ips.index)
+    for i, ip in ips.items():
+        assert table.loc[i].to_dict() == geo_lookup(ip)
+
+
+def test_build_geo_table_is_per_unique_ip():
+    table = build_geo_table(["203.0.113.10", "203.0.113.10", None, "8.8.8.8"])
+    assert table.index.tolist() == ["203.0.113.10", "8.8.8.8"]
+    assert table.loc["203.0.113.10", "city"] == "Exville"
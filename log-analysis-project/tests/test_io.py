@@ -0,0 +1,79 @@
+"""
+Tests for load_events and its Parquet twin in scripts/io.py.
+
+This checks that the twin is only trusted while it is at least as new as the
+CSV, that raw_event is never loaded, and that a failed twin write does not
+stop the CSV from being returned.
+"""
+
+import os
+import pandas as pd
+from scripts.io import load_events, parquet_twin, LOAD_COLUMNS
+
+
+def write_events_csv(path, users):
+    pd.DataFrame({
+        "timestamp": ["2025-11-30T12:00:00Z"] * len(users),
+        "event_id": [4625] * len(users),
+        "event_type": ["failed_login"] * len(users),
+        "username": users,
+        "ip": ["203.0.113.10"] * len(users),
+        "status": ["Failure"] * len(users),
+        "raw_event": ["<Event/>"] * len(users),
+    }).to_csv(path, index=False)
+
+
+def set_mtime(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+
+def test_load_events_excludes_raw_event_and_writes_twin(tmp_path):
+    csv = tmp_path / "events.csv"
+    write_events_csv(csv, ["alice", "bob"])
+    df = load_events(str(csv))
+    assert list(df.columns) == LOAD_COLUMNS
+    assert "raw_event" not in df.columns
+    assert os.path.exists(parquet_twin(str(csv)))
+
+
+def test_twin_reused_only_when_not_older_than_csv(tmp_path):
+    csv = tmp_path / "events.csv"
+    write_events_csv(csv, ["alice"])
+    twin = parquet_twin(str(csv))
+    # A twin with different contents shows which file was read
+    load_events(str(csv)).assign(username="from_twin").to_parquet(twin, index=False)
+
+    set_mtime(csv, 1_000_000)
+    set_mtime(twin, 1_000_000)
+    assert load_events(str(csv))["username"].tolist() == ["from_twin"]
+
+    set_mtime(twin, 999_999)
+    assert load_events(str(csv))["username"].tolist() == ["alice"]
+
+
+def test_twin_rebuilt_after_csv_changes(tmp_path):
+    csv = tmp_path / "events.csv"
+    write_events_csv(csv, ["alice"])
+    load_events(str(csv))
+    twin = parquet_twin(str(csv))
+    set_mtime(twin, 1_000_000)
+
+    write_events_csv(csv, ["bob", "carol"])
+    set_mtime(csv, 2_000_000)
+    assert load_events(str(csv))["username"].tolist() == ["bob", "carol"]
+    # The twin now holds the new rows and is fresh again
+    assert pd.read_parquet(twin)["username"].tolist() == ["bob", "carol"]
+    assert os.path.getmtime(twin) >= os.path.getmtime(csv)
+
+
+def test_load_events_returns_when_twin_write_fails(tmp_path, monkeypatch):
+    csv = tmp_path / "events.csv"
+    write_events_csv(csv, ["alice"])
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", fail)
+    df = load_events(str(csv))
+    assert df["username"].tolist() == ["alice"]
+    assert not os.path.exists(parquet_twin(str(csv)))
@@ -5,11 +5,15 @@ This test ensures that:
 - The parser returns a DataFrame
 - Required columns are present
 - At least one failed and one success event is parsed
+- EventData names are matched case-insensitively, with child-tag fallbacks
+  (also when the Data value is a placeholder such as "-" or an invalid address)
 """
 
 import pytest
 import os
-from scripts.parser import parse_directory
+import pandas as pd
+from scripts.parser import parse_directory, parse_event_element, _parse_timestamps, ET
+
 
 def test_parse_sample_logs():
     basedir = os.path.join(os.path.dirname(__file__), "..", "data", "sample_logs")
@@ -20,4 +24,57 @@ def test_parse_sample_logs():
         assert col in df.columns
     # should contain 4625 and 4624 events based on sample files
     assert (df["event_id"] == 4625).any(), "Should have at least one failure event 4625"
-    assert (df["event_id"] == 4624).any(), "Should have at least one success event 4624"
\ No newline at end of file
+    assert (df["event_id"] == 4624).any(), "Should have at least one success event 4624"
+
+
+def test_parse_event_element_field_names():
+    xml = (
+        "<Event><System><EventID>4625</EventID><TimeCreated SystemTime='2025-11-30T12:00:01Z'/></System>"
+        "<EventData><Data Name='ACCOUNTNAME'>dave</Data><Data Name='result'>Weird</Data>"
+        "<IpAddress>10.0.0.1</IpAddress></EventData></Event>"
+    )
+    timestamp, event_id, username, ip, status, raw = parse_event_element(ET.fromstring(xml))
+    assert (timestamp, event_id, username, ip, status, raw) == ("2025-11-30T12:00:01Z", 4625, "dave", "10.0.0.1", "Weird", "")
+
+
+def test_ip_placeholder_falls_back_to_child_tag(tmp_path):
+    data_values = ["-", "999.1.1.1", "1.2.3", "garbage"]
+    (tmp_path / "events.xml").write_text("<Events>" + "".join(
+        "<Event><System><EventID>4625</EventID><TimeCreated SystemTime='2025-11-30T12:00:01Z'/></System>"
+        f"<EventData><Data Name='IpAddress'>{v}</Data><IpAddress>10.0.0.2</IpAddress></EventData></Event>"
+        for v in data_values
+    ) + "</Events>")
+    df = parse_directory(str(tmp_path))
+    assert df["ip"].tolist() == ["10.0.0.2"] * len(data_values)
+
+
+def test_out_of_range_event_id_becomes_zero(tmp_path):
+    (tmp_path / "events.xml").write_text(
+        "<Events><Event><System><EventID>99999999999</EventID></System></Event>"
+        "<Event><System><EventID>4625</EventID></System></Event></Events>"
+    )
+    df = parse_directory(str(tmp_path))
+    assert df["event_id"].tolist() == [0, 4625]
+
+
+def test_parse_timestamps_mixed_naive_and_offset():
+    raw = pd.Series(["2025-11-30T12:00:01+02:00", "2025-11-30 12:00:01", "2025-11-30T12:00:01Z", "", None, "junk"])
+    ts = _parse_timestamps(raw)
+    utc = pd.Timestamp("2025-11-30 12:00:01", tz="UTC")
+    # Naive strings are UTC regardless of offsets elsewhere in the column
+    assert ts.iloc[:3].tolist() == [utc - pd.Timedelta(hours=2), utc, utc]
+    assert ts.iloc[3:].isna().all()
+
+
+def test_external_entities_are_not_resolved(tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("s3cret")
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "events.xml").write_text(
+        f'<?xml version="1.0"?><!DOCTYPE Events [<!ENTITY xxe SYSTEM "file://{secret}">]>'
+        "<Events><Event><System><EventID>4625</EventID></System>"
+        "<EventData><Data Name='TargetUserName'>&xxe;</Data></EventData></Event></Events>"
+    )
+    df = parse_directory(str(logs))
+    assert "s3cret" not in df.astype(str).to_string()
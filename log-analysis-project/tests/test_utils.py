@@ -0,0 +1,39 @@
+"""
+Tests for the helpers in scripts/utils.py.
+
+Checks that the regex fast paths in clean_timestamp and extract_ip_safe give
+the same results as the strptime/dateutil and ipaddress fallbacks.
+"""
+
+from datetime import datetime, timezone
+from scripts.utils import clean_timestamp, extract_ip_safe, extract_ips_batch
+
+
+def test_clean_timestamp_fast_path_formats():
+    expected = datetime(2025, 11, 30, 12, 0, 1, tzinfo=timezone.utc)
+    for s in ["2025-11-30T12:00:01Z", "2025-11-30 12:00:01", "2025-11-30T12:00:01"]:
+        assert clean_timestamp(s) == expected
+    # Windows SystemTime has 7 fractional digits; the extra digit is truncated
+    assert clean_timestamp("2025-11-30T12:00:01.1234567Z") == expected.replace(microsecond=123456)
+
+
+def test_clean_timestamp_offsets_and_invalid():
+    # Offsets are not taken by the fast path and are still converted to UTC
+    assert clean_timestamp("2025-11-30T12:00:01+02:00") == datetime(2025, 11, 30, 10, 0, 1, tzinfo=timezone.utc)
+    assert clean_timestamp("2025-13-30T12:00:01Z") is None
+    assert clean_timestamp("") is None
+
+
+def test_extract_ip_safe():
+    assert extract_ip_safe(" 10.0.0.1 ") == "10.0.0.1"
+    assert extract_ip_safe("2001:db8::1") == "2001:0db8:0000:0000:0000:0000:0000:0001"
+    for placeholder in ["", "-", "127.0.0.1", "::1"]:
+        assert extract_ip_safe(placeholder) == ""
+    # Invalid input is dropped rather than raising
+    assert extract_ip_safe("256.1.1.1") == ""
+    assert extract_ip_safe("not-an-ip") == ""
+
+
+def test_extract_ips_batch_matches_scalar():
+    values = [" 10.0.0.1", "-", None, "2001:db8::1", "999.0.0.1", "10.0.0.1", "bad\n1.2.3.4", "", "192.0.2.5"]
+    assert extract_ips_batch(values) == [extract_ip_safe(v) for v in values]